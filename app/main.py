@@ -1,6 +1,8 @@
+from tools.dpi import set_dpi_awareness
 from tools.window_screenshot import WindowScreenshot
 
 if __name__ == '__main__':
+    set_dpi_awareness()
     window_screen = WindowScreenshot()
 
     windows = window_screen.get_all_windows()
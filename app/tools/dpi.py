@@ -0,0 +1,98 @@
+"""
+DPI 模块
+=======================
+设置进程和线程的 DPI 感知级别，使窗口矩形和截图尺寸以物理像素为单位。
+在高 DPI 或多显示器混合 DPI 环境下，未设置 DPI 感知会导致截图模糊、窗口尺寸错误以及截图不完整。
+
+依赖项：
+- ctypes
+"""
+import ctypes
+from contextlib import contextmanager
+from ctypes import wintypes
+from typing import Iterator
+
+# DPI 感知常量
+DPI_AWARENESS_CONTEXT_PER_MONITOR_AWARE_V2 = -4
+PROCESS_SYSTEM_DPI_AWARE = 1
+PROCESS_PER_MONITOR_DPI_AWARE = 2
+
+_user32 = ctypes.WinDLL('user32', use_last_error=True)
+
+
+def _get_function(library: str, name: str, argtypes: list, restype):
+    """
+    获取 DLL 中的函数并声明其签名，旧版 Windows 中不存在该函数时返回 None。
+    参数：
+        library: DLL 名称
+        name: 函数名称
+        argtypes: 参数类型列表
+        restype: 返回类型
+    返回：
+        ctypes 函数对象，如果不可用则返回 None
+    """
+    try:
+        function = getattr(ctypes.WinDLL(library, use_last_error=True), name)
+    except (OSError, AttributeError):
+        return None
+    function.argtypes = argtypes
+    function.restype = restype
+    return function
+
+
+# Windows 10 1703 及以上
+_SetProcessDpiAwarenessContext = _get_function(
+    'user32', 'SetProcessDpiAwarenessContext', [wintypes.HANDLE], wintypes.BOOL
+)
+# Windows 10 1607 及以上
+_SetThreadDpiAwarenessContext = _get_function(
+    'user32', 'SetThreadDpiAwarenessContext', [wintypes.HANDLE], wintypes.HANDLE
+)
+# Windows 8.1 及以上
+_SetProcessDpiAwareness = _get_function(
+    'shcore', 'SetProcessDpiAwareness', [ctypes.c_int], ctypes.c_long
+)
+
+
+def set_dpi_awareness() -> bool:
+    """
+    将进程设置为尽可能高的 DPI 感知级别。
+    依次尝试 Per-Monitor v2、Per-Monitor 和 System 级别。
+    返回：
+        如果成功设置了任一级别则返回 True，否则返回 False
+    """
+    if _SetProcessDpiAwarenessContext is not None:
+        if _SetProcessDpiAwarenessContext(DPI_AWARENESS_CONTEXT_PER_MONITOR_AWARE_V2):
+            return True
+    if _SetProcessDpiAwareness is not None:
+        for awareness in (PROCESS_PER_MONITOR_DPI_AWARE, PROCESS_SYSTEM_DPI_AWARE):
+            if _SetProcessDpiAwareness(awareness) == 0:
+                return True
+    return bool(_user32.SetProcessDPIAware())
+
+
+def set_thread_dpi_awareness() -> bool:
+    """
+    将当前线程永久设置为 Per-Monitor v2 DPI 感知，使 GetWindowRect 在外接显示器上也返回物理像素。
+    只应在专用的工作线程中调用；该线程之后创建的窗口也会使用此 DPI 感知级别。
+    返回：
+        如果设置成功则返回 True，否则返回 False
+    """
+    if _SetThreadDpiAwarenessContext is None:
+        return False
+    return bool(_SetThreadDpiAwarenessContext(DPI_AWARENESS_CONTEXT_PER_MONITOR_AWARE_V2))
+
+
+@contextmanager
+def thread_dpi_awareness() -> Iterator[None]:
+    """
+    在 with 块内将当前线程临时设置为 Per-Monitor v2 DPI 感知，退出时恢复原来的 DPI 感知上下文。
+    """
+    previous = None
+    if _SetThreadDpiAwarenessContext is not None:
+        previous = _SetThreadDpiAwarenessContext(DPI_AWARENESS_CONTEXT_PER_MONITOR_AWARE_V2)
+    try:
+        yield
+    finally:
+        if previous:
+            _SetThreadDpiAwarenessContext(previous)
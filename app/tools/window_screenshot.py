@@ -2,41 +2,113 @@
 WindowScreenshot 模块
 =======================
 一个用于捕获 Windows 应用程序屏幕截图的 Python 模块，特别支持 DirectX 和其他难以捕获的窗口。
-该模块提供了多种捕获窗口屏幕截图的方法，包括标准 GDI、PrintWindow API 以及针对 DirectX 应用程序的替代方法。
+该模块提供了多种捕获窗口屏幕截图的方法，包括 Windows.Graphics.Capture (WGC)、标准 GDI、PrintWindow API
+以及针对 DirectX 应用程序的替代方法。
 
 功能：
 - 按标题或进程名称查找窗口
 - 多种捕获方法，具有自动回退机制
 - 支持最小化的窗口
 - 检测空白/失败的捕获
+- 后台线程流式捕获（三重缓冲）
 - 详细的窗口信息访问
 
 依赖项：
 - ctypes
 - numpy
 - opencv-python (cv2)
-- pywin32 (win32gui, win32ui, win32con, win32process)
+- pywin32 (win32con)
 - Pillow (PIL)
+- winrt（可选，Windows.Graphics.Capture 捕获所需，Windows 10 1903 及以上）
+- numba（可选，用于加速空白图像检测）
 """
 import ctypes
+import functools
 from ctypes import wintypes, windll, byref, c_void_p
 import time
 import numpy as np
 import cv2
-import win32gui
-import win32ui
 import win32con
-import win32process
 from PIL import Image
 import os
 import sys
-from typing import List, Tuple, Dict, Optional, Union, Any
+import threading
+import uuid
+import weakref
+from collections import defaultdict
+from typing import List, Tuple, Dict, Optional, Union, Any, Callable
+
+try:
+    from winrt.windows.graphics.capture import Direct3D11CaptureFramePool, GraphicsCaptureSession
+    from winrt.windows.graphics.capture.interop import create_for_window
+    from winrt.windows.graphics.directx import DirectXPixelFormat
+    from winrt.windows.graphics.directx.direct3d11.interop import (
+        create_direct3d11_device_from_dxgi_device,
+        get_dxgi_surface_from_object
+    )
+    WGC_AVAILABLE = True
+except ImportError:
+    WGC_AVAILABLE = False
+
+try:
+    from .dpi import set_thread_dpi_awareness, thread_dpi_awareness
+except ImportError:
+    # 作为脚本直接运行时
+    from dpi import set_thread_dpi_awareness, thread_dpi_awareness
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
 
 # Windows API 常量
 PW_CLIENTONLY = 1
 PW_RENDERFULLCONTENT = 2
+GA_ROOT = 2
+GW_HWNDPREV = 3
+WM_PRINT = 0x0317
+PRF_NON_CLIENT = 0x00000002
+PRF_CLIENT = 0x00000004
+PRF_CHILDREN = 0x00000010
+DWMWA_EXTENDED_FRAME_BOUNDS = 9
+DWMWA_CLOAKED = 14
+BI_RGB = 0
+DIB_RGB_COLORS = 0
+
+# Direct3D 11 常量
+D3D_DRIVER_TYPE_HARDWARE = 1
+D3D11_CREATE_DEVICE_BGRA_SUPPORT = 0x20
+D3D11_SDK_VERSION = 7
+D3D11_USAGE_STAGING = 3
+D3D11_CPU_ACCESS_READ = 0x20000
+D3D11_MAP_READ = 1
+
+# COM 虚函数表索引
+IUNKNOWN_QUERY_INTERFACE = 0
+IUNKNOWN_RELEASE = 2
+D3D11_DEVICE_CREATE_TEXTURE_2D = 5
+D3D11_CONTEXT_MAP = 14
+D3D11_CONTEXT_UNMAP = 15
+D3D11_CONTEXT_COPY_RESOURCE = 47
+D3D11_TEXTURE_2D_GET_DESC = 10
 
 # Windows API 结构体
+class GUID(ctypes.Structure):
+    _fields_ = [
+        ("Data1", wintypes.DWORD),
+        ("Data2", wintypes.WORD),
+        ("Data3", wintypes.WORD),
+        ("Data4", wintypes.BYTE * 8)
+    ]
+
+    def __init__(self, value: str):
+        super().__init__()
+        ctypes.memmove(byref(self), uuid.UUID(value).bytes_le, ctypes.sizeof(self))
+
+IID_IDXGIDevice = GUID("54ec77fa-1377-44e6-8c32-88fd5f44c84c")
+IID_ID3D11Texture2D = GUID("6f15aaf2-d208-4e89-9ab4-489535d34f9c")
+
 class RECT(ctypes.Structure):
     _fields_ = [
         ("left", ctypes.c_long),
@@ -45,6 +117,27 @@ class RECT(ctypes.Structure):
         ("bottom", ctypes.c_long)
     ]
 
+class BITMAPINFOHEADER(ctypes.Structure):
+    _fields_ = [
+        ("biSize", wintypes.DWORD),
+        ("biWidth", wintypes.LONG),
+        ("biHeight", wintypes.LONG),
+        ("biPlanes", wintypes.WORD),
+        ("biBitCount", wintypes.WORD),
+        ("biCompression", wintypes.DWORD),
+        ("biSizeImage", wintypes.DWORD),
+        ("biXPelsPerMeter", wintypes.LONG),
+        ("biYPelsPerMeter", wintypes.LONG),
+        ("biClrUsed", wintypes.DWORD),
+        ("biClrImportant", wintypes.DWORD)
+    ]
+
+class BITMAPINFO(ctypes.Structure):
+    _fields_ = [
+        ("bmiHeader", BITMAPINFOHEADER),
+        ("bmiColors", wintypes.DWORD * 3)
+    ]
+
 class WINDOWINFO(ctypes.Structure):
     _fields_ = [
         ("cbSize", wintypes.DWORD),
@@ -59,6 +152,299 @@ class WINDOWINFO(ctypes.Structure):
         ("wCreatorVersion", wintypes.WORD)
     ]
 
+class DXGI_SAMPLE_DESC(ctypes.Structure):
+    _fields_ = [
+        ("Count", wintypes.UINT),
+        ("Quality", wintypes.UINT)
+    ]
+
+class D3D11_TEXTURE2D_DESC(ctypes.Structure):
+    _fields_ = [
+        ("Width", wintypes.UINT),
+        ("Height", wintypes.UINT),
+        ("MipLevels", wintypes.UINT),
+        ("ArraySize", wintypes.UINT),
+        ("Format", wintypes.UINT),
+        ("SampleDesc", DXGI_SAMPLE_DESC),
+        ("Usage", wintypes.UINT),
+        ("BindFlags", wintypes.UINT),
+        ("CPUAccessFlags", wintypes.UINT),
+        ("MiscFlags", wintypes.UINT)
+    ]
+
+class D3D11_MAPPED_SUBRESOURCE(ctypes.Structure):
+    _fields_ = [
+        ("pData", c_void_p),
+        ("RowPitch", wintypes.UINT),
+        ("DepthPitch", wintypes.UINT)
+    ]
+
+def com_call(ptr: Union[int, c_void_p], index: int, restype: Any, argtypes: tuple, *args: Any) -> Any:
+    """
+    调用 COM 接口虚函数表中的方法。
+    参数：
+        ptr: COM 接口指针
+        index: 方法在虚函数表中的索引
+        restype: 返回类型（ctypes.HRESULT 会在失败时抛出 OSError）
+        argtypes: 除 this 指针外的参数类型
+        *args: 调用参数
+    返回：
+        方法的返回值
+    """
+    vtable = ctypes.cast(ptr, ctypes.POINTER(ctypes.POINTER(c_void_p)))[0]
+    method = ctypes.WINFUNCTYPE(restype, c_void_p, *argtypes)(vtable[index])
+    return method(ptr, *args)
+
+def com_release(ptr: Union[int, c_void_p]) -> None:
+    """释放 COM 接口指针。"""
+    if ptr:
+        com_call(ptr, IUNKNOWN_RELEASE, wintypes.ULONG, ())
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True, parallel=True)
+    def _luma_variance(pixels, step, w0, w1, w2):
+        """
+        按步长采样计算亮度方差，将亮度转换、求和与平方和合并在一次遍历中完成。
+        参数：
+            pixels: 形状为 (height, width, channels) 的 uint8 数组
+            step: 行列采样步长
+            w0, w1, w2: 前三个通道的整数亮度权重（总和为 256）
+        返回：
+            采样像素亮度的方差
+        """
+        height, width = pixels.shape[0], pixels.shape[1]
+        rows = (height + step - 1) // step
+        cols = (width + step - 1) // step
+        total = 0
+        total_sq = 0
+        for i in prange(rows):
+            y = i * step
+            row_sum = 0
+            row_sq = 0
+            for x in range(0, width, step):
+                luma = (pixels[y, x, 0] * w0 + pixels[y, x, 1] * w1 + pixels[y, x, 2] * w2) >> 8
+                row_sum += luma
+                row_sq += luma * luma
+            total += row_sum
+            total_sq += row_sq
+        n = rows * cols
+        return (total_sq - total * total / n) / n
+
+    @njit(cache=True, parallel=True)
+    def _bgra_to_gray(pixels, step):
+        """
+        按步长采样将 BGRA 像素转换为灰度，转换与降采样在一次遍历中完成。
+        参数：
+            pixels: 形状为 (height, width, 4) 的 BGRA uint8 数组
+            step: 行列采样步长
+        返回：
+            灰度 uint8 数组
+        """
+        height = (pixels.shape[0] + step - 1) // step
+        width = (pixels.shape[1] + step - 1) // step
+        out = np.empty((height, width), np.uint8)
+        for i in prange(height):
+            y = i * step
+            for j in range(width):
+                x = j * step
+                out[i, j] = (pixels[y, x, 0] * 29 + pixels[y, x, 1] * 150 + pixels[y, x, 2] * 77) >> 8
+        return out
+
+# 记录当前线程是否已处于 Per-Monitor v2 DPI 感知状态
+_thread_state = threading.local()
+
+
+def _per_monitor_dpi(method):
+    """
+    装饰器：调用期间将当前线程临时设置为 Per-Monitor v2 DPI 感知，返回前恢复原来的上下文，
+    使窗口矩形和屏幕坐标都以物理像素计算，又不会改变调用方线程之后创建的窗口。
+    嵌套调用以及已永久设置 DPI 感知的线程不再重复切换。
+    """
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        if getattr(_thread_state, "dpi_aware", False):
+            return method(*args, **kwargs)
+        _thread_state.dpi_aware = True
+        try:
+            with thread_dpi_awareness():
+                return method(*args, **kwargs)
+        finally:
+            _thread_state.dpi_aware = False
+    return wrapper
+
+# 在导入时一次性加载 user32/gdi32 并声明函数签名，避免每帧重复的属性查找
+_user32 = ctypes.WinDLL('user32', use_last_error=True)
+_gdi32 = ctypes.WinDLL('gdi32', use_last_error=True)
+_dwmapi = ctypes.WinDLL('dwmapi')
+
+_user32.PrintWindow.argtypes = [wintypes.HWND, wintypes.HDC, wintypes.UINT]
+_user32.PrintWindow.restype = wintypes.BOOL
+_user32.GetWindowInfo.argtypes = [wintypes.HWND, ctypes.POINTER(WINDOWINFO)]
+_user32.GetWindowInfo.restype = wintypes.BOOL
+_user32.GetWindowRect.argtypes = [wintypes.HWND, ctypes.POINTER(RECT)]
+_user32.GetWindowRect.restype = wintypes.BOOL
+_user32.IsIconic.argtypes = [wintypes.HWND]
+_user32.IsIconic.restype = wintypes.BOOL
+_user32.ShowWindow.argtypes = [wintypes.HWND, ctypes.c_int]
+_user32.ShowWindow.restype = wintypes.BOOL
+_user32.SendMessageW.argtypes = [wintypes.HWND, wintypes.UINT, wintypes.WPARAM, wintypes.LPARAM]
+_user32.SendMessageW.restype = wintypes.LPARAM
+_user32.FindWindowExW.argtypes = [wintypes.HWND, wintypes.HWND, wintypes.LPCWSTR, wintypes.LPCWSTR]
+_user32.FindWindowExW.restype = wintypes.HWND
+_user32.IsWindowVisible.argtypes = [wintypes.HWND]
+_user32.IsWindowVisible.restype = wintypes.BOOL
+_user32.GetWindowTextLengthW.argtypes = [wintypes.HWND]
+_user32.GetWindowTextLengthW.restype = ctypes.c_int
+_user32.GetWindowTextW.argtypes = [wintypes.HWND, wintypes.LPWSTR, ctypes.c_int]
+_user32.GetWindowTextW.restype = ctypes.c_int
+_user32.GetWindowThreadProcessId.argtypes = [wintypes.HWND, ctypes.POINTER(wintypes.DWORD)]
+_user32.GetWindowThreadProcessId.restype = wintypes.DWORD
+_user32.GetForegroundWindow.argtypes = []
+_user32.GetForegroundWindow.restype = wintypes.HWND
+_user32.GetAncestor.argtypes = [wintypes.HWND, wintypes.UINT]
+_user32.GetAncestor.restype = wintypes.HWND
+_user32.GetWindow.argtypes = [wintypes.HWND, wintypes.UINT]
+_user32.GetWindow.restype = wintypes.HWND
+_user32.IsWindow.argtypes = [wintypes.HWND]
+_user32.IsWindow.restype = wintypes.BOOL
+_user32.GetWindowLongW.argtypes = [wintypes.HWND, ctypes.c_int]
+_user32.GetWindowLongW.restype = wintypes.LONG
+_user32.GetLayeredWindowAttributes.argtypes = [
+    wintypes.HWND, ctypes.POINTER(wintypes.COLORREF), ctypes.POINTER(ctypes.c_ubyte), ctypes.POINTER(wintypes.DWORD)
+]
+_user32.GetLayeredWindowAttributes.restype = wintypes.BOOL
+_dwmapi.DwmGetWindowAttribute.argtypes = [wintypes.HWND, wintypes.DWORD, c_void_p, wintypes.DWORD]
+_dwmapi.DwmGetWindowAttribute.restype = ctypes.HRESULT
+# 捕获路径中的 GDI 调用通过 ctypes 执行，调用期间会释放 GIL
+_user32.GetWindowDC.argtypes = [wintypes.HWND]
+_user32.GetWindowDC.restype = wintypes.HDC
+_user32.ReleaseDC.argtypes = [wintypes.HWND, wintypes.HDC]
+_user32.ReleaseDC.restype = ctypes.c_int
+_gdi32.CreateCompatibleDC.argtypes = [wintypes.HDC]
+_gdi32.CreateCompatibleDC.restype = wintypes.HDC
+_gdi32.CreateCompatibleBitmap.argtypes = [wintypes.HDC, ctypes.c_int, ctypes.c_int]
+_gdi32.CreateCompatibleBitmap.restype = wintypes.HBITMAP
+_gdi32.SelectObject.argtypes = [wintypes.HDC, wintypes.HGDIOBJ]
+_gdi32.SelectObject.restype = wintypes.HGDIOBJ
+_gdi32.DeleteObject.argtypes = [wintypes.HGDIOBJ]
+_gdi32.DeleteObject.restype = wintypes.BOOL
+_gdi32.DeleteDC.argtypes = [wintypes.HDC]
+_gdi32.DeleteDC.restype = wintypes.BOOL
+_gdi32.BitBlt.argtypes = [
+    wintypes.HDC, ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_int,
+    wintypes.HDC, ctypes.c_int, ctypes.c_int, wintypes.DWORD
+]
+_gdi32.BitBlt.restype = wintypes.BOOL
+# GetDIBits 用于将位图像素直接写入 numpy 缓冲区
+_gdi32.GetDIBits.argtypes = [
+    wintypes.HDC, wintypes.HBITMAP, wintypes.UINT, wintypes.UINT,
+    c_void_p, ctypes.POINTER(BITMAPINFO), wintypes.UINT
+]
+_gdi32.GetDIBits.restype = ctypes.c_int
+
+# EnumWindows 回调类型，回调对象在模块级别只创建一次，枚举状态通过 lParam 传递
+WNDENUMPROC = ctypes.WINFUNCTYPE(wintypes.BOOL, wintypes.HWND, wintypes.LPARAM)
+_user32.EnumWindows.argtypes = [WNDENUMPROC, wintypes.LPARAM]
+_user32.EnumWindows.restype = wintypes.BOOL
+
+# 枚举结果列表的预分配长度，超出后改为追加
+_ENUM_PREALLOC = 128
+
+# 缓冲池中每种形状最多保留的空闲缓冲区数量
+_POOL_LIMIT = 4
+
+# 设备上下文缓存和 WGC 会话缓存各自最多保留的窗口数量
+_CACHE_LIMIT = 8
+
+# WGC 帧池的缓冲区数量；所有缓冲区都被排队的帧占用时，WGC 不再记录新画面
+_WGC_BUFFER_COUNT = 2
+# 帧池已满时等待一帧当前画面的最长时间（秒）
+_WGC_FRESH_TIMEOUT = 0.05
+
+# screenshot_window 支持的数组输出格式
+OUTPUT_FORMATS = ("gray", "gray_half", "rgb", "bgra")
+
+# 自动模式按兼容性依次尝试的捕获方法
+AUTO_METHODS = ("wgc", "composition", "printwindow", "standard", "d3d")
+
+
+class _EnumContext:
+    """
+    一次 EnumWindows 枚举的状态。
+    以 py_object 的地址作为 lParam 传给模块级回调。
+    """
+    __slots__ = ("needle", "min_length", "require_process", "buffer", "process_id", "result", "count")
+
+    def __init__(self, needle: str, min_length: int, require_process: bool,
+                 buffer: ctypes.Array, process_id: wintypes.DWORD):
+        self.needle = needle
+        self.min_length = min_length
+        self.require_process = require_process
+        self.buffer = buffer
+        self.process_id = process_id
+        self.result: List[Any] = [None] * _ENUM_PREALLOC
+        self.count = 0
+
+
+def _enum_windows_callback(hwnd: int, lparam: int,
+                           _IsWindowVisible=_user32.IsWindowVisible,
+                           _GetWindowTextLengthW=_user32.GetWindowTextLengthW,
+                           _GetWindowTextW=_user32.GetWindowTextW,
+                           _GetWindowThreadProcessId=_user32.GetWindowThreadProcessId,
+                           _context_ptr=ctypes.POINTER(ctypes.py_object)) -> bool:
+    """
+    EnumWindows 回调：收集标题包含 needle（不区分大小写）的可见窗口。
+    user32 函数作为默认参数绑定为局部变量；标题长度不足的窗口在读取标题前即被跳过。
+    """
+    if not _IsWindowVisible(hwnd):
+        return True
+    context = ctypes.cast(lparam, _context_ptr).contents.value
+    length = _GetWindowTextLengthW(hwnd)
+    if length < context.min_length:
+        return True
+    buffer = context.buffer
+    if length >= len(buffer):
+        buffer = ctypes.create_unicode_buffer(length + 1)
+    _GetWindowTextW(hwnd, buffer, len(buffer))
+    window_title = buffer.value
+    if context.needle and context.needle not in window_title.lower():
+        return True
+    _GetWindowThreadProcessId(hwnd, byref(context.process_id))
+    process_id = context.process_id.value
+    if context.require_process and not process_id:
+        return True
+    item = (hwnd, window_title, process_id)
+    count = context.count
+    if count < _ENUM_PREALLOC:
+        context.result[count] = item
+    else:
+        context.result.append(item)
+    context.count = count + 1
+    return True
+
+
+_enum_windows_proc = WNDENUMPROC(_enum_windows_callback)
+
+class WGCSession:
+    """
+    单个窗口的 Windows.Graphics.Capture 捕获状态。
+    保存捕获项、帧池、会话，以及在多次捕获之间复用的暂存纹理和输出缓冲区。
+    """
+    def __init__(self, item, frame_pool, session, size):
+        self.item = item
+        self.frame_pool = frame_pool
+        self.session = session
+        self.size = size
+        self.staging = c_void_p()
+        self.width = 0
+        self.height = 0
+        # 最近一帧的有效内容尺寸，窗口缩小时可能小于暂存纹理
+        self.content_width = 0
+        self.content_height = 0
+        self.pixels: Optional[np.ndarray] = None
+        self.mapped = False
+        self.frame_number = 0
+
 class WindowScreenshot:
     """
     用于捕获 Windows 应用程序屏幕截图的类。
@@ -70,36 +456,219 @@ class WindowScreenshot:
         参数：
             verbose: 如果为 True，在捕获尝试期间打印详细日志
         """
-        self.user32 = ctypes.WinDLL('user32')
-        self.gdi32 = ctypes.WinDLL('gdi32')
+        self.user32 = _user32
+        self.gdi32 = _gdi32
         self.verbose = verbose
-        # 定义 user32.dll 中的 PrintWindow 函数
-        self.user32.PrintWindow.argtypes = [wintypes.HWND, wintypes.HDC, wintypes.UINT]
-        self.user32.PrintWindow.restype = wintypes.BOOL
+        # 绑定捕获路径中使用的函数，避免每次调用时的属性查找
+        self._PrintWindow = _user32.PrintWindow
+        self._GetWindowInfo = _user32.GetWindowInfo
+        self._GetWindowRect = _user32.GetWindowRect
+        self._IsIconic = _user32.IsIconic
+        self._ShowWindow = _user32.ShowWindow
+        self._SendMessageW = _user32.SendMessageW
+        self._GetDIBits = _gdi32.GetDIBits
+        self._BitBlt = _gdi32.BitBlt
+        self._rect = RECT()
+        # 查找窗口时复用的标题缓冲区和进程 ID
+        self._title_buffer = ctypes.create_unicode_buffer(256)
+        self._process_id = wintypes.DWORD()
+        # 按窗口句柄缓存的设备上下文、位图和像素缓冲区，仅在窗口尺寸变化时重新创建
+        # hwnd -> (hwnd_dc, mem_dc, bitmap, old_bitmap, width, height, pixels, bmi)
+        self._cache: Dict[int, tuple] = {}
+        # WGC 使用的 Direct3D 11 设备，首次使用时创建
+        self._d3d_device = c_void_p()
+        self._d3d_context = c_void_p()
+        self._wgc_device = None
+        # 设备创建失败后不再尝试 WGC，避免每次调用都重新创建设备
+        self._wgc_failed = False
+        # 按窗口句柄缓存的 WGC 捕获会话
+        self._wgc_cache: Dict[int, WGCSession] = {}
+        # prepare 创建的专用资源，每个窗口只保留最近一次，在重新 prepare 或 close 时释放
+        self._prepared: Dict[int, tuple] = {}
+        # 按形状回收的空闲像素缓冲区，窗口尺寸变化时复用已分配的内存
+        self._pool: Dict[tuple, List[np.ndarray]] = defaultdict(list)
+        self._pool_lock = threading.Lock()
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
+    def close(self) -> None:
+        """释放所有缓存的设备上下文和位图。"""
+        for hwnd in list(self._cache):
+            self._release_dc(hwnd)
+        while self._prepared:
+            self._free_dc(*self._prepared.popitem())
+        for hwnd in list(self._wgc_cache):
+            self._release_wgc(hwnd)
+        self._wgc_device = None
+        com_release(self._d3d_context)
+        com_release(self._d3d_device)
+        self._d3d_context = c_void_p()
+        self._d3d_device = c_void_p()
+        with self._pool_lock:
+            self._pool.clear()
+
+    def _borrow(self, shape: tuple) -> np.ndarray:
+        """
+        从缓冲池取出指定形状的缓冲区，池中没有时新分配一个。
+        参数：
+            shape: 缓冲区形状，如 (height, width, 4)
+        返回：
+            未初始化的 uint8 数组
+        """
+        with self._pool_lock:
+            free = self._pool.get(shape)
+            if free:
+                return free.pop()
+        return np.empty(shape, np.uint8)
+
+    def _release(self, arr: Optional[np.ndarray]) -> None:
+        """
+        将不再使用的缓冲区归还缓冲池，供之后相同尺寸的捕获复用。
+        只能用于已确定不再被任何缓存条目或调用方引用的缓冲区。
+        参数：
+            arr: 由 _borrow 分配的 uint8 数组；视图会被忽略
+        """
+        if arr is None or arr.base is not None or arr.dtype != np.uint8 or not arr.flags.writeable:
+            return
+        with self._pool_lock:
+            free = self._pool[arr.shape]
+            if len(free) < _POOL_LIMIT and not any(a is arr for a in free):
+                free.append(arr)
 
     def log(self, message: str) -> None:
         """如果启用了详细模式，则打印日志消息。"""
         if self.verbose:
             print(message)
 
-    def get_window_handles_by_title(self, title_substring: str) -> List[Tuple[int, str]]:
+    def _get_window_text(self, hwnd: int, length: int) -> str:
         """
-        获取标题中包含子字符串的窗口句柄。
+        读取窗口标题，长度不超过缓冲区时复用同一个缓冲区。
         参数：
-            title_substring: 要在窗口标题中搜索的字符串
+            hwnd: 窗口句柄
+            length: GetWindowTextLengthW 返回的标题长度
         返回：
-            匹配窗口的元组列表 (hwnd, window_title)
+            窗口标题
+        """
+        buffer = self._title_buffer
+        if length >= len(buffer):
+            buffer = ctypes.create_unicode_buffer(length + 1)
+        _user32.GetWindowTextW(hwnd, buffer, len(buffer))
+        return buffer.value
+
+    def _get_process_id(self, hwnd: int) -> int:
+        """获取创建窗口的进程 ID。"""
+        _user32.GetWindowThreadProcessId(hwnd, byref(self._process_id))
+        return self._process_id.value
+
+    @staticmethod
+    def _min_title_length(needle: str) -> int:
+        """
+        返回能够（不区分大小写地）包含 needle 的标题的最小长度，用于在读取标题前跳过窗口。
+        str.lower() 可能改变非 ASCII 字符串的长度（例如 'İ'），此时不做长度过滤。
+        """
+        return len(needle) if needle.isascii() else 0
+
+    def _enum_windows(self, needle: str, require_title: bool = False,
+                      require_process: bool = False) -> List[Tuple[int, str, int]]:
+        """
+        通过模块级 EnumWindows 回调枚举标题包含 needle 的可见窗口。
+        参数：
+            needle: 要在窗口标题中搜索的字符串（空字符串表示不过滤）
+            require_title: 如果为 True，跳过没有标题的窗口
+            require_process: 如果为 True，跳过无法获取进程 ID 的窗口
+        返回：
+            匹配窗口的元组列表 (hwnd, window_title, process_id)
+        """
+        min_length = self._min_title_length(needle)
+        if require_title:
+            min_length = max(min_length, 1)
+        context = _EnumContext(needle.lower(), min_length, require_process,
+                               self._title_buffer, self._process_id)
+        # 枚举期间保持 py_object 存活，回调通过其地址取回 context
+        holder = ctypes.py_object(context)
+        _user32.EnumWindows(_enum_windows_proc, ctypes.addressof(holder))
+        result = context.result
+        del result[context.count:]
+        return result
+
+    def _fast_find_by_title(self, title: str) -> List[Tuple[int, str, int]]:
+        """
+        使用 FindWindowExW 查找标题完全匹配（不区分大小写）的顶层窗口，比较在内核中完成。
+        参数：
+            title: 完整的窗口标题
+        返回：
+            匹配窗口的元组列表 (hwnd, window_title, process_id)
         """
         result = []
-        def callback(hwnd, extra):
-            if win32gui.IsWindowVisible(hwnd):
-                window_title = win32gui.GetWindowText(hwnd)
-                if title_substring.lower() in window_title.lower():
-                    result.append((hwnd, window_title))
-            return True
-        win32gui.EnumWindows(callback, None)
+        hwnd = _user32.FindWindowExW(None, None, None, title)
+        while hwnd:
+            if _user32.IsWindowVisible(hwnd):
+                window_title = self._get_window_text(hwnd, _user32.GetWindowTextLengthW(hwnd))
+                result.append((hwnd, window_title, self._get_process_id(hwnd)))
+            hwnd = _user32.FindWindowExW(None, hwnd, None, title)
         return result
 
+    def _fast_find_by_title_prefix(self, prefix: str) -> List[Tuple[int, str, int]]:
+        """
+        使用 FindWindowExW 遍历顶层窗口，查找标题以指定前缀开头（不区分大小写）的窗口。
+        标题长度不足的窗口在读取标题前即被跳过。
+        参数：
+            prefix: 标题前缀
+        返回：
+            匹配窗口的元组列表 (hwnd, window_title, process_id)
+        """
+        result = []
+        min_length = self._min_title_length(prefix)
+        prefix = prefix.lower()
+        hwnd = _user32.FindWindowExW(None, None, None, None)
+        while hwnd:
+            if _user32.IsWindowVisible(hwnd):
+                length = _user32.GetWindowTextLengthW(hwnd)
+                if length >= min_length:
+                    window_title = self._get_window_text(hwnd, length)
+                    if window_title.lower().startswith(prefix):
+                        result.append((hwnd, window_title, self._get_process_id(hwnd)))
+            hwnd = _user32.FindWindowExW(None, hwnd, None, None)
+        return result
+
+    def get_window_handles_by_title(self, title_substring: str,
+                                    match: str = "substring") -> List[Tuple[int, str, int]]:
+        """
+        获取标题匹配的窗口句柄（不区分大小写）。
+        参数：
+            title_substring: 要在窗口标题中搜索的字符串
+            match: 匹配方式 ("exact" 完全匹配, "prefix" 前缀匹配, 或 "substring" 子字符串匹配)
+        返回：
+            匹配窗口的元组列表 (hwnd, window_title, process_id)
+        异常：
+            ValueError: 如果指定了未知的匹配方式
+        """
+        if match == "exact":
+            return self._fast_find_by_title(title_substring)
+        if match == "prefix":
+            return self._fast_find_by_title_prefix(title_substring)
+        if match != "substring":
+            raise ValueError(f"未知的匹配方式: {match}")
+        return self._enum_windows(title_substring)
+
+    def find_window(self, title_substring: str, match: str = "substring") -> List[Dict[str, Any]]:
+        """
+        查找标题匹配的可见窗口。
+        参数：
+            title_substring: 要在窗口标题中搜索的字符串
+            match: 匹配方式 ("exact", "prefix", 或 "substring")
+        返回：
+            窗口信息的字典列表
+        """
+        return [
+            {"handle": hwnd, "title": title, "process_id": pid}
+            for hwnd, title, pid in self.get_window_handles_by_title(title_substring, match)
+        ]
+
     def get_window_handles_by_process_name(self, process_name: str = "") -> List[Tuple[int, str, int]]:
         """
         根据进程名称获取窗口句柄。
@@ -108,21 +677,8 @@ class WindowScreenshot:
         返回：
             匹配窗口的元组列表 (hwnd, window_title, process_id)
         """
-        result = []
-        def callback(hwnd, extra):
-            if win32gui.IsWindowVisible(hwnd):
-                try:
-                    _, process_id = win32process.GetWindowThreadProcessId(hwnd)
-                    if process_id:
-                        window_title = win32gui.GetWindowText(hwnd)
-                        if window_title:  # 仅包括有标题的窗口
-                            if not process_name or process_name.lower() in window_title.lower():
-                                result.append((hwnd, window_title, process_id))
-                except Exception:
-                    pass
-            return True
-        win32gui.EnumWindows(callback, None)
-        return result
+        # 仅包括有标题且属于某个进程的窗口
+        return self._enum_windows(process_name, require_title=True, require_process=True)
 
     def get_window_info(self, hwnd: int) -> WINDOWINFO:
         """
@@ -134,7 +690,7 @@ class WindowScreenshot:
         """
         wi = WINDOWINFO()
         wi.cbSize = ctypes.sizeof(WINDOWINFO)
-        self.user32.GetWindowInfo(hwnd, ctypes.byref(wi))
+        self._GetWindowInfo(hwnd, ctypes.byref(wi))
         return wi
 
     def is_window_minimized(self, hwnd: int) -> bool:
@@ -145,7 +701,7 @@ class WindowScreenshot:
         返回：
             如果窗口已最小化则返回 True，否则返回 False
         """
-        return self.user32.IsIconic(hwnd)
+        return bool(self._IsIconic(hwnd))
 
     def restore_window(self, hwnd: int) -> None:
         """
@@ -153,91 +709,539 @@ class WindowScreenshot:
         参数：
             hwnd: 窗口句柄
         """
-        self.user32.ShowWindow(hwnd, win32con.SW_RESTORE)
+        self._ShowWindow(hwnd, win32con.SW_RESTORE)
         time.sleep(0.5)  # 给窗口一些时间恢复
 
-    def capture_standard(self, hwnd: int) -> Optional[Image.Image]:
+    def _get_window_size(self, hwnd: int) -> Tuple[int, int]:
         """
-        使用标准 Windows GDI 方法捕获窗口。
+        获取窗口尺寸。调用方需处于 _per_monitor_dpi 范围内，才能在任意显示器上得到物理像素。
         参数：
             hwnd: 窗口句柄
         返回：
-            窗口内容的 PIL 图像，如果捕获失败则返回 None
+            元组 (width, height)
+        异常：
+            OSError: 如果 GetWindowRect 调用失败
+        """
+        rect = self._rect
+        if not self._GetWindowRect(hwnd, byref(rect)):
+            raise ctypes.WinError(ctypes.get_last_error())
+        return rect.right - rect.left, rect.bottom - rect.top
+
+    def _get_or_create_dc(self, hwnd: int, width: int, height: int) -> tuple:
         """
+        获取窗口的缓存设备上下文和位图，若尺寸与上次不同则重新创建。
+        参数：
+            hwnd: 窗口句柄
+            width: 当前窗口宽度
+            height: 当前窗口高度
+        返回：
+            元组 (hwnd_dc, mem_dc, bitmap, old_bitmap, width, height, pixels, bmi)
+        异常：
+            OSError: 如果无法创建设备上下文或位图
+        """
+        entry = self._cache.get(hwnd)
+        if entry is not None:
+            if entry[4] == width and entry[5] == height:
+                return entry
+            # 窗口尺寸已变化，释放旧资源
+            self._release_dc(hwnd)
+        self._evict_stale(self._cache, self._release_dc)
+        entry = self._create_dc(hwnd, width, height)
+        self._cache[hwnd] = entry
+        return entry
+
+    @staticmethod
+    def _evict_stale(cache: Dict[int, Any], release: Callable[[int], None]) -> None:
+        """
+        在新建缓存条目前释放已销毁窗口的条目；条目数仍达到上限时，按插入顺序释放最早的条目。
+        参数：
+            cache: 以窗口句柄为键的缓存字典（句柄 0 表示屏幕）
+            release: 释放单个条目的方法
+        """
+        for hwnd in [h for h in cache if h and not _user32.IsWindow(h)]:
+            release(hwnd)
+        while len(cache) >= _CACHE_LIMIT:
+            release(next(iter(cache)))
+
+    def _create_dc(self, hwnd: int, width: int, height: int) -> tuple:
+        """
+        为窗口创建设备上下文、兼容位图、BITMAPINFO 和像素缓冲区。
+        参数：
+            hwnd: 窗口句柄
+            width: 位图宽度
+            height: 位图高度
+        返回：
+            元组 (hwnd_dc, mem_dc, bitmap, old_bitmap, width, height, pixels, bmi)
+        异常：
+            OSError: 如果无法创建设备上下文或位图
+        """
+        # 创建设备上下文
+        hwnd_dc = _user32.GetWindowDC(hwnd)
+        if not hwnd_dc:
+            raise ctypes.WinError(ctypes.get_last_error())
+        mem_dc = _gdi32.CreateCompatibleDC(hwnd_dc)
+        # 创建位图
+        bitmap = _gdi32.CreateCompatibleBitmap(hwnd_dc, width, height)
+        if not mem_dc or not bitmap:
+            if bitmap:
+                _gdi32.DeleteObject(bitmap)
+            if mem_dc:
+                _gdi32.DeleteDC(mem_dc)
+            _user32.ReleaseDC(hwnd, hwnd_dc)
+            raise ctypes.WinError(ctypes.get_last_error())
+        old_bitmap = _gdi32.SelectObject(mem_dc, bitmap)
+        # 预分配像素缓冲区，GetDIBits 每帧直接写入其中
+        pixels = self._borrow((height, width, 4))
+        bmi = BITMAPINFO()
+        bmi.bmiHeader.biSize = ctypes.sizeof(BITMAPINFOHEADER)
+        bmi.bmiHeader.biWidth = width
+        bmi.bmiHeader.biHeight = -height  # 负高度表示自上而下的位图
+        bmi.bmiHeader.biPlanes = 1
+        bmi.bmiHeader.biBitCount = 32
+        bmi.bmiHeader.biCompression = BI_RGB
+        return (hwnd_dc, mem_dc, bitmap, old_bitmap, width, height, pixels, bmi)
+
+    def _release_dc(self, hwnd: int) -> None:
+        """
+        释放窗口的缓存设备上下文和位图。
+        参数：
+            hwnd: 窗口句柄
+        """
+        entry = self._cache.pop(hwnd, None)
+        if entry is not None:
+            self._free_dc(hwnd, entry)
+
+    def _free_dc(self, hwnd: int, entry: tuple) -> None:
+        """
+        释放 _create_dc 创建的设备上下文和位图，并将像素缓冲区归还缓冲池。
+        参数：
+            hwnd: 窗口句柄
+            entry: _create_dc 返回的元组
+        """
+        hwnd_dc, mem_dc, bitmap, old_bitmap = entry[:4]
+        _gdi32.SelectObject(mem_dc, old_bitmap)
+        _gdi32.DeleteObject(bitmap)
+        _gdi32.DeleteDC(mem_dc)
+        _user32.ReleaseDC(hwnd, hwnd_dc)
+        self._release(entry[6])
+
+    def _read_pixels(self, entry: tuple) -> Optional[np.ndarray]:
+        """
+        通过 GetDIBits 将缓存位图的像素读入预分配的缓冲区。
+        参数：
+            entry: _get_or_create_dc 返回的缓存元组
+        返回：
+            形状为 (height, width, 4) 的 BGRA 数组（下次捕获时会被覆盖），失败则返回 None
+        """
+        _, mem_dc, bitmap, _, width, height, pixels, bmi = entry
+        lines = self._GetDIBits(mem_dc, bitmap, 0, height, pixels.ctypes.data, byref(bmi), DIB_RGB_COLORS)
+        return pixels if lines == height else None
+
+    @staticmethod
+    def _to_image(pixels: np.ndarray) -> Image.Image:
+        """
+        将 BGRA 像素缓冲区转换为 RGB PIL 图像。
+        参数：
+            pixels: 形状为 (height, width, 4) 的 BGRA 数组
+        返回：
+            PIL 图像
+        """
+        height, width = pixels.shape[:2]
+        return Image.frombuffer('RGB', (width, height), pixels, 'raw', 'BGRX', 0, 1)
+
+    @staticmethod
+    def _convert_pixels(pixels: np.ndarray, fmt: str) -> np.ndarray:
+        """
+        将 BGRA 像素数组转换为指定的输出格式。
+        灰度按 (B*29 + G*150 + R*77) >> 8 计算；"gray_half" 先隔行隔列采样再转换，只处理四分之一的像素。
+        参数：
+            pixels: 形状为 (height, width, 4) 的 BGRA 数组
+            fmt: 输出格式 ("gray", "gray_half", "rgb", 或 "bgra")
+        返回：
+            转换后的数组，"bgra" 时直接返回 pixels
+        """
+        if fmt == "bgra":
+            return pixels
+        if fmt == "rgb":
+            return cv2.cvtColor(pixels, cv2.COLOR_BGRA2RGB)
+        step = 2 if fmt == "gray_half" else 1
+        if NUMBA_AVAILABLE:
+            return _bgra_to_gray(pixels, step)
+        if step > 1:
+            pixels = pixels[::step, ::step]
+        # 权重总和为 256，uint16 足以容纳中间结果
+        luma = pixels[..., 0].astype(np.uint16) * 29
+        luma += pixels[..., 1].astype(np.uint16) * 150
+        luma += pixels[..., 2].astype(np.uint16) * 77
+        luma >>= 8
+        return luma.astype(np.uint8)
+
+    def _get_wgc_device(self):
+        """
+        获取（首次调用时创建）WGC 帧池所需的 Direct3D 11 设备。
+        返回：
+            包装 DXGI 设备的 WinRT IDirect3DDevice
+        """
+        if self._wgc_device is None:
+            dxgi_device = c_void_p()
+            try:
+                d3d11 = ctypes.WinDLL('d3d11')
+                d3d11.D3D11CreateDevice.restype = ctypes.HRESULT
+                d3d11.D3D11CreateDevice(
+                    None, D3D_DRIVER_TYPE_HARDWARE, None, D3D11_CREATE_DEVICE_BGRA_SUPPORT,
+                    None, 0, D3D11_SDK_VERSION, byref(self._d3d_device), None, byref(self._d3d_context)
+                )
+                # 通过 IDXGIDevice 创建 WinRT 设备
+                com_call(self._d3d_device, IUNKNOWN_QUERY_INTERFACE, ctypes.HRESULT,
+                         (ctypes.POINTER(GUID), ctypes.POINTER(c_void_p)),
+                         byref(IID_IDXGIDevice), byref(dxgi_device))
+                self._wgc_device = create_direct3d11_device_from_dxgi_device(dxgi_device.value)
+            except Exception:
+                # 释放已创建的设备和上下文，并记住失败，之后的调用直接跳过 WGC
+                com_release(self._d3d_context)
+                com_release(self._d3d_device)
+                self._d3d_context = c_void_p()
+                self._d3d_device = c_void_p()
+                self._wgc_failed = True
+                raise
+            finally:
+                com_release(dxgi_device)
+        return self._wgc_device
+
+    def _get_or_create_wgc(self, hwnd: int) -> "WGCSession":
+        """
+        获取窗口的缓存 WGC 捕获会话，首次调用时创建并启动。
+        参数：
+            hwnd: 窗口句柄
+        返回：
+            WGCSession 对象
+        """
+        state = self._wgc_cache.get(hwnd)
+        if state is None:
+            self._evict_stale(self._wgc_cache, self._release_wgc)
+            device = self._get_wgc_device()
+            item = create_for_window(hwnd)
+            frame_pool = Direct3D11CaptureFramePool.create_free_threaded(
+                device, DirectXPixelFormat.B8_G8_R8_A8_UINT_NORMALIZED, _WGC_BUFFER_COUNT, item.size
+            )
+            session = frame_pool.create_capture_session(item)
+            session.is_cursor_capture_enabled = False
+            try:
+                # 隐藏黄色捕获边框（仅 Windows 11 支持）
+                session.is_border_required = False
+            except Exception:
+                pass
+            session.start_capture()
+            state = WGCSession(item, frame_pool, session, item.size)
+            self._wgc_cache[hwnd] = state
+        return state
+
+    def _release_wgc(self, hwnd: int) -> None:
+        """
+        停止窗口的 WGC 捕获会话并释放暂存纹理。
+        参数：
+            hwnd: 窗口句柄
+        """
+        state = self._wgc_cache.pop(hwnd, None)
+        if state is None:
+            return
+        self._release(state.pixels)
         try:
-            # 获取窗口尺寸
-            rect = win32gui.GetWindowRect(hwnd)
-            width = rect[2] - rect[0]
-            height = rect[3] - rect[1]
-            # 创建设备上下文
-            hwnd_dc = win32gui.GetWindowDC(hwnd)
-            mfc_dc = win32ui.CreateDCFromHandle(hwnd_dc)
-            save_dc = mfc_dc.CreateCompatibleDC()
-            # 创建位图
-            save_bitmap = win32ui.CreateBitmap()
-            save_bitmap.CreateCompatibleBitmap(mfc_dc, width, height)
-            save_dc.SelectObject(save_bitmap)
-            # 捕获窗口内容
-            result = save_dc.BitBlt((0, 0), (width, height), mfc_dc, (0, 0), win32con.SRCCOPY)
-            # 将位图转换为 PIL 图像
-            bmpinfo = save_bitmap.GetInfo()
-            bmpstr = save_bitmap.GetBitmapBits(True)
-            img = Image.frombuffer(
-                'RGB',
-                (bmpinfo['bmWidth'], bmpinfo['bmHeight']),
-                bmpstr, 'raw', 'BGRX', 0, 1
+            self._unmap_wgc(state)
+            com_release(state.staging)
+            state.session.close()
+            state.frame_pool.close()
+        except Exception as e:
+            self.log(f"释放 WGC 会话失败: {e}")
+
+    def _unmap_wgc(self, state: "WGCSession") -> None:
+        """取消零拷贝模式下仍处于映射状态的暂存纹理。"""
+        if state.mapped:
+            com_call(self._d3d_context, D3D11_CONTEXT_UNMAP, None,
+                     (c_void_p, wintypes.UINT), state.staging, 0)
+            state.mapped = False
+
+    def _copy_wgc_frame(self, state: "WGCSession", frame) -> None:
+        """
+        将 WGC 帧复制到常驻暂存纹理，尺寸变化时重建暂存纹理。
+        参数：
+            state: WGCSession 对象
+            frame: Direct3D11CaptureFrame
+        """
+        surface = get_dxgi_surface_from_object(frame.surface)
+        texture = c_void_p()
+        try:
+            com_call(surface, IUNKNOWN_QUERY_INTERFACE, ctypes.HRESULT,
+                     (ctypes.POINTER(GUID), ctypes.POINTER(c_void_p)),
+                     byref(IID_ID3D11Texture2D), byref(texture))
+            desc = D3D11_TEXTURE2D_DESC()
+            com_call(texture, D3D11_TEXTURE_2D_GET_DESC, None,
+                     (ctypes.POINTER(D3D11_TEXTURE2D_DESC),), byref(desc))
+            if not state.staging or (desc.Width, desc.Height) != (state.width, state.height):
+                # 按帧纹理的格式和尺寸创建暂存纹理
+                com_release(state.staging)
+                state.staging = c_void_p()
+                desc.MipLevels = 1
+                desc.ArraySize = 1
+                desc.SampleDesc.Count = 1
+                desc.SampleDesc.Quality = 0
+                desc.Usage = D3D11_USAGE_STAGING
+                desc.BindFlags = 0
+                desc.CPUAccessFlags = D3D11_CPU_ACCESS_READ
+                desc.MiscFlags = 0
+                com_call(self._d3d_device, D3D11_DEVICE_CREATE_TEXTURE_2D, ctypes.HRESULT,
+                         (ctypes.POINTER(D3D11_TEXTURE2D_DESC), c_void_p, ctypes.POINTER(c_void_p)),
+                         byref(desc), None, byref(state.staging))
+                state.width, state.height = desc.Width, desc.Height
+            com_call(self._d3d_context, D3D11_CONTEXT_COPY_RESOURCE, None,
+                     (c_void_p, c_void_p), state.staging, texture)
+        finally:
+            com_release(texture)
+            com_release(surface)
+
+    @staticmethod
+    def _wait_wgc_frame(state: "WGCSession", timeout: float):
+        """
+        等待帧池中出现新帧。
+        参数：
+            state: WGCSession 对象
+            timeout: 最长等待时间（秒）
+        返回：
+            Direct3D11CaptureFrame，超时则返回 None
+        """
+        deadline = time.perf_counter() + timeout
+        frame = state.frame_pool.try_get_next_frame()
+        while frame is None and time.perf_counter() < deadline:
+            time.sleep(0.001)
+            frame = state.frame_pool.try_get_next_frame()
+        return frame
+
+    def _take_wgc_frame(self, state: "WGCSession", frame) -> None:
+        """
+        将帧复制到暂存纹理并关闭帧，记录有效内容尺寸；窗口尺寸变化时重建帧池。
+        参数：
+            state: WGCSession 对象
+            frame: Direct3D11CaptureFrame
+        """
+        with frame:
+            content_size = frame.content_size
+            self._copy_wgc_frame(state, frame)
+        state.frame_number += 1
+        # 窗口缩小的那一帧，纹理右侧和底部超出内容的部分是无效像素
+        state.content_width = min(content_size.width, state.width)
+        state.content_height = min(content_size.height, state.height)
+        if (content_size.width, content_size.height) != (state.size.width, state.size.height):
+            # 窗口尺寸已变化，按新尺寸重建帧池
+            state.size = content_size
+            state.frame_pool.recreate(
+                self._get_wgc_device(), DirectXPixelFormat.B8_G8_R8_A8_UINT_NORMALIZED,
+                _WGC_BUFFER_COUNT, content_size
             )
-            # 清理资源
-            win32gui.DeleteObject(save_bitmap.GetHandle())
-            save_dc.DeleteDC()
-            mfc_dc.DeleteDC()
-            win32gui.ReleaseDC(hwnd, hwnd_dc)
-            return img if result else None
+
+    def capture_wgc_array(self, hwnd: int, zero_copy: bool = False,
+                          timeout: float = 1.0) -> Optional[np.ndarray]:
+        """
+        使用 Windows.Graphics.Capture 捕获窗口，返回 BGRA 像素数组。
+        捕获会话、暂存纹理和输出缓冲区在同一窗口的多次调用之间复用；
+        窗口内容未变化时 WGC 不产生新帧，此时返回上一帧的内容。
+        参数：
+            hwnd: 窗口句柄
+            zero_copy: 如果为 True，直接返回映射的暂存纹理内存视图（只读，仅在下次捕获前有效）
+            timeout: 首帧的最长等待时间（秒）
+        返回：
+            形状为 (height, width, 4) 的 BGRA 数组（下次捕获时会被覆盖），失败则返回 None
+        """
+        if not WGC_AVAILABLE:
+            self.log("WGC 不可用：未安装 winrt")
+            return None
+        if self._wgc_failed:
+            self.log("WGC 不可用：Direct3D 设备创建失败")
+            return None
+        try:
+            if not GraphicsCaptureSession.is_supported():
+                self.log("WGC 不可用：系统不支持")
+                return None
+            state = self._get_or_create_wgc(hwnd)
+            self._unmap_wgc(state)
+            # 丢弃积压的旧帧，只保留最新一帧
+            frame = None
+            pending = 0
+            while True:
+                next_frame = state.frame_pool.try_get_next_frame()
+                if next_frame is None:
+                    break
+                if frame is not None:
+                    frame.close()
+                frame = next_frame
+                pending += 1
+            if pending >= _WGC_BUFFER_COUNT:
+                # 帧池已满时 WGC 停止记录新画面，排队的最新帧可能早于本次调用（调用间隔较长时）。
+                # 先将其复制为后备并释放帧池，再短暂等待一帧当前画面；窗口内容未变化时不会有新帧，使用后备
+                self._take_wgc_frame(state, frame)
+                frame = self._wait_wgc_frame(state, _WGC_FRESH_TIMEOUT)
+            elif frame is None and not state.staging:
+                # 会话刚启动，等待第一帧
+                frame = self._wait_wgc_frame(state, timeout)
+                if frame is None:
+                    self.log("WGC 等待帧超时")
+                    return None
+            if frame is not None:
+                self._take_wgc_frame(state, frame)
+            # 映射暂存纹理并按行距读出像素
+            mapped = D3D11_MAPPED_SUBRESOURCE()
+            com_call(self._d3d_context, D3D11_CONTEXT_MAP, ctypes.HRESULT,
+                     (c_void_p, wintypes.UINT, wintypes.UINT, wintypes.UINT,
+                      ctypes.POINTER(D3D11_MAPPED_SUBRESOURCE)),
+                     state.staging, 0, D3D11_MAP_READ, 0, byref(mapped))
+            state.mapped = True
+            data = (ctypes.c_ubyte * (mapped.RowPitch * state.height)).from_address(mapped.pData)
+            rows = np.frombuffer(data, np.uint8).reshape(state.height, mapped.RowPitch // 4, 4)
+            content = rows[:state.content_height, :state.content_width]
+            if zero_copy:
+                content.flags.writeable = False
+                return content
+            if state.pixels is None or state.pixels.shape != content.shape:
+                self._release(state.pixels)
+                state.pixels = self._borrow(content.shape)
+            np.copyto(state.pixels, content)
+            self._unmap_wgc(state)
+            return state.pixels
         except Exception as e:
-            self.log(f"标准捕获失败: {e}")
+            self.log(f"WGC 捕获失败: {e}")
+            self._release_wgc(hwnd)
             return None
 
-    def capture_with_print_window(self, hwnd: int) -> Optional[Image.Image]:
+    def capture_with_wgc(self, hwnd: int) -> Optional[Image.Image]:
         """
-        使用 PrintWindow API 捕获窗口内容（对 DirectX 更友好）。
+        使用 Windows.Graphics.Capture 捕获窗口（硬件加速，支持 DirectX 和 UWP 窗口）。
+        需要安装 winrt 且系统为 Windows 10 1903 及以上。
         参数：
             hwnd: 窗口句柄
         返回：
-            窗口内容的 PIL 图像，如果捕获失败则返回 None
+            窗口内容的 PIL 图像，如果捕获失败或 WGC 不可用则返回 None
+        """
+        pixels = self.capture_wgc_array(hwnd)
+        return self._to_image(pixels) if pixels is not None else None
+
+    def _capture_standard_into(self, entry: tuple, hwnd: int) -> bool:
+        """
+        使用 BitBlt 将窗口内容复制到缓存位图中。
+        参数：
+            entry: _get_or_create_dc 返回的缓存元组
+            hwnd: 窗口句柄
+        返回：
+            如果复制成功则返回 True
+        """
+        hwnd_dc, mem_dc, _, _, width, height = entry[:6]
+        return bool(self._BitBlt(mem_dc, 0, 0, width, height, hwnd_dc, 0, 0, win32con.SRCCOPY))
+
+    def _capture_printwindow_into(self, entry: tuple, hwnd: int) -> bool:
+        """
+        使用 PrintWindow 将窗口内容绘制到缓存位图中。
+        参数：
+            entry: _get_or_create_dc 返回的缓存元组
+            hwnd: 窗口句柄
+        返回：
+            如果绘制成功则返回 True
+        """
+        return bool(self._PrintWindow(hwnd, entry[1], PW_RENDERFULLCONTENT))
+
+    def _capture_wmprint_into(self, entry: tuple, hwnd: int, require_handled: bool = True) -> bool:
+        """
+        发送 WM_PRINT 消息，让窗口将自身绘制到缓存位图中。
+        参数：
+            entry: _get_or_create_dc 返回的缓存元组
+            hwnd: 窗口句柄
+            require_handled: 如果为 True，SendMessageW 返回 0（窗口未处理该消息）时视为失败，跳过像素读取
+        返回：
+            如果窗口处理了消息（或 require_handled 为 False）则返回 True
+        """
+        handled = self._SendMessageW(hwnd, WM_PRINT, entry[1], PRF_CLIENT | PRF_CHILDREN | PRF_NON_CLIENT)
+        return bool(handled) or not require_handled
+
+    @_per_monitor_dpi
+    def _capture_gdi_array(self, hwnd: int, capture_into, name: str) -> Optional[np.ndarray]:
+        """
+        使用指定的 GDI 方法将窗口绘制到缓存位图中，并读出像素。
+        参数：
+            hwnd: 窗口句柄
+            capture_into: _capture_*_into 方法之一
+            name: 用于日志的方法名称
+        返回：
+            形状为 (height, width, 4) 的 BGRA 数组（下次捕获时会被覆盖），如果捕获失败则返回 None
         """
         try:
             # 获取窗口尺寸
-            rect = win32gui.GetWindowRect(hwnd)
-            width = rect[2] - rect[0]
-            height = rect[3] - rect[1]
-            # 创建设备上下文
-            hwnd_dc = win32gui.GetWindowDC(hwnd)
-            mfc_dc = win32ui.CreateDCFromHandle(hwnd_dc)
-            save_dc = mfc_dc.CreateCompatibleDC()
-            # 创建位图
-            save_bitmap = win32ui.CreateBitmap()
-            save_bitmap.CreateCompatibleBitmap(mfc_dc, width, height)
-            save_dc.SelectObject(save_bitmap)
-            # 使用 PrintWindow 捕获 - 直接通过 ctypes 使用 user32.dll
-            result = self.user32.PrintWindow(hwnd, save_dc.GetSafeHdc(), PW_RENDERFULLCONTENT)
-            # 将位图转换为 PIL 图像
-            bmpinfo = save_bitmap.GetInfo()
-            bmpstr = save_bitmap.GetBitmapBits(True)
-            img = Image.frombuffer(
-                'RGB',
-                (bmpinfo['bmWidth'], bmpinfo['bmHeight']),
-                bmpstr, 'raw', 'BGRX', 0, 1
-            )
-            # 清理资源
-            win32gui.DeleteObject(save_bitmap.GetHandle())
-            save_dc.DeleteDC()
-            mfc_dc.DeleteDC()
-            win32gui.ReleaseDC(hwnd, hwnd_dc)
-            return img if result else None
+            width, height = self._get_window_size(hwnd)
+            # 获取（或在尺寸变化时重建）缓存的设备上下文和位图
+            entry = self._get_or_create_dc(hwnd, width, height)
+            if not capture_into(entry, hwnd):
+                return None
+            # 将位图像素读入缓冲区
+            return self._read_pixels(entry)
         except Exception as e:
-            self.log(f"PrintWindow 捕获失败: {e}")
+            self.log(f"{name}失败: {e}")
+            self._release_dc(hwnd)
             return None
 
+    def capture_standard_array(self, hwnd: int) -> Optional[np.ndarray]:
+        """
+        使用标准 Windows GDI 方法捕获窗口，返回 BGRA 像素数组。
+        参数：
+            hwnd: 窗口句柄
+        返回：
+            形状为 (height, width, 4) 的 BGRA 数组（下次捕获时会被覆盖），如果捕获失败则返回 None
+        """
+        return self._capture_gdi_array(hwnd, self._capture_standard_into, "标准捕获")
+
+    def capture_standard(self, hwnd: int) -> Optional[Image.Image]:
+        """
+        使用标准 Windows GDI 方法捕获窗口。
+        参数：
+            hwnd: 窗口句柄
+        返回：
+            窗口内容的 PIL 图像，如果捕获失败则返回 None
+        """
+        pixels = self.capture_standard_array(hwnd)
+        return self._to_image(pixels) if pixels is not None else None
+
+    def capture_print_window_array(self, hwnd: int) -> Optional[np.ndarray]:
+        """
+        使用 PrintWindow API 捕获窗口内容（对 DirectX 更友好），返回 BGRA 像素数组。
+        参数：
+            hwnd: 窗口句柄
+        返回：
+            形状为 (height, width, 4) 的 BGRA 数组（下次捕获时会被覆盖），如果捕获失败则返回 None
+        """
+        return self._capture_gdi_array(hwnd, self._capture_printwindow_into, "PrintWindow 捕获")
+
+    def capture_with_print_window(self, hwnd: int) -> Optional[Image.Image]:
+        """
+        使用 PrintWindow API 捕获窗口内容（对 DirectX 更友好）。
+        参数：
+            hwnd: 窗口句柄
+        返回：
+            窗口内容的 PIL 图像，如果捕获失败则返回 None
+        """
+        pixels = self.capture_print_window_array(hwnd)
+        return self._to_image(pixels) if pixels is not None else None
+
+    def capture_d3d_array(self, hwnd: int, require_handled: bool = False) -> Optional[np.ndarray]:
+        """
+        使用 WM_PRINT 消息捕获 DirectX 窗口的替代方法，返回 BGRA 像素数组。
+        参数：
+            hwnd: 窗口句柄
+            require_handled: 如果为 True，窗口未处理 WM_PRINT（SendMessageW 返回 0）时直接返回 None。
+                             自动模式使用该选项；部分正常绘制的窗口也会返回 0，因此单独使用时默认不检查
+        返回：
+            形状为 (height, width, 4) 的 BGRA 数组（下次捕获时会被覆盖），如果捕获失败则返回 None
+        """
+        return self._capture_gdi_array(
+            hwnd,
+            lambda entry, hwnd: self._capture_wmprint_into(entry, hwnd, require_handled),
+            "D3D 捕获方法"
+        )
+
     def capture_with_d3d(self, hwnd: int) -> Optional[Image.Image]:
         """
         使用 WM_PRINT 消息捕获 DirectX 窗口的替代方法。
@@ -247,162 +1251,287 @@ class WindowScreenshot:
         返回：
             窗口内容的 PIL 图像，如果捕获失败则返回 None
         """
+        pixels = self.capture_d3d_array(hwnd)
+        return self._to_image(pixels) if pixels is not None else None
+
+    @_per_monitor_dpi
+    def capture_composition_array(self, hwnd: int) -> Optional[np.ndarray]:
+        """
+        从 DWM 合成后的桌面画面中截取窗口区域，返回 BGRA 像素数组。
+        合成画面包含 DirectX 翻转模型等 GDI 无法读取的内容，且不会抢占焦点；
+        但只有窗口位于前台且没有置顶窗口与其重叠时截到的才是该窗口的内容，否则返回 None。
+        参数：
+            hwnd: 窗口句柄
+        返回：
+            形状为 (height, width, 4) 的 BGRA 数组（下次捕获时会被覆盖），如果捕获失败则返回 None
+        """
         try:
-            # 获取窗口尺寸
-            rect = win32gui.GetWindowRect(hwnd)
-            width = rect[2] - rect[0]
-            height = rect[3] - rect[1]
-            # 创建设备上下文
-            hwnd_dc = win32gui.GetWindowDC(hwnd)
-            mfc_dc = win32ui.CreateDCFromHandle(hwnd_dc)
-            save_dc = mfc_dc.CreateCompatibleDC()
-            # 创建位图
-            save_bitmap = win32ui.CreateBitmap()
-            save_bitmap.CreateCompatibleBitmap(mfc_dc, width, height)
-            save_dc.SelectObject(save_bitmap)
-            # 尝试使用 WM_PRINT/WM_PRINTCLIENT 消息
-            WM_PRINT = 0x0317
-            PRF_CLIENT = 0x00000004
-            PRF_CHILDREN = 0x00000010
-            PRF_NON_CLIENT = 0x00000002
-            self.user32.SendMessageW(
-                hwnd,
-                WM_PRINT,
-                save_dc.GetSafeHdc(),
-                PRF_CLIENT | PRF_CHILDREN | PRF_NON_CLIENT
-            )
-            # 将位图转换为 PIL 图像
-            bmpinfo = save_bitmap.GetInfo()
-            bmpstr = save_bitmap.GetBitmapBits(True)
-            img = Image.frombuffer(
-                'RGB',
-                (bmpinfo['bmWidth'], bmpinfo['bmHeight']),
-                bmpstr, 'raw', 'BGRX', 0, 1
-            )
-            # 清理资源
-            win32gui.DeleteObject(save_bitmap.GetHandle())
-            save_dc.DeleteDC()
-            mfc_dc.DeleteDC()
-            win32gui.ReleaseDC(hwnd, hwnd_dc)
-            return img
+            root = _user32.GetAncestor(hwnd, GA_ROOT)
+            foreground = _user32.GetForegroundWindow()
+            if not foreground or _user32.GetAncestor(foreground, GA_ROOT) != root:
+                self.log("合成捕获跳过：窗口不在前台，合成画面可能被其他窗口遮挡")
+                return None
+            # DWM 实际绘制的窗口边界（不含不可见的缩放边框）
+            rect = self._rect
+            _dwmapi.DwmGetWindowAttribute(hwnd, DWMWA_EXTENDED_FRAME_BOUNDS, byref(rect), ctypes.sizeof(RECT))
+            if self._is_covered(root, rect):
+                self.log("合成捕获跳过：窗口被置顶窗口遮挡")
+                return None
+            left, top = rect.left, rect.top
+            width, height = rect.right - left, rect.bottom - top
+            # 句柄 0 对应整个屏幕的设备上下文
+            entry = self._get_or_create_dc(0, width, height)
+            screen_dc, mem_dc = entry[0], entry[1]
+            if not self._BitBlt(mem_dc, 0, 0, width, height, screen_dc, left, top, win32con.SRCCOPY):
+                return None
+            return self._read_pixels(entry)
         except Exception as e:
-            self.log(f"D3D 捕获方法失败: {e}")
+            self.log(f"合成捕获失败: {e}")
+            self._release_dc(0)
             return None
 
+    @staticmethod
+    def _is_covered(hwnd: int, bounds: RECT) -> bool:
+        """
+        检查 Z 序位于窗口之上的可见窗口（例如置顶的覆盖层）是否与给定区域相交。
+        参数：
+            hwnd: 顶层窗口句柄
+            bounds: 窗口在屏幕上的区域（物理像素）
+        返回：
+            如果区域被其他窗口部分或全部遮挡则返回 True
+        """
+        other = RECT()
+        cloaked = wintypes.DWORD()
+        color_key = wintypes.COLORREF()
+        alpha = ctypes.c_ubyte()
+        flags = wintypes.DWORD()
+        current = _user32.GetWindow(hwnd, GW_HWNDPREV)
+        while current:
+            visible = _user32.IsWindowVisible(current) and not _user32.IsIconic(current)
+            if visible:
+                ex_style = _user32.GetWindowLongW(current, win32con.GWL_EXSTYLE)
+                # 点击穿透的覆盖层（如显卡厂商的全屏叠加层）以及完全透明的分层窗口不会遮挡画面
+                if ex_style & win32con.WS_EX_TRANSPARENT:
+                    visible = False
+                elif ex_style & win32con.WS_EX_LAYERED:
+                    if (_user32.GetLayeredWindowAttributes(current, byref(color_key), byref(alpha), byref(flags))
+                            and flags.value & win32con.LWA_ALPHA and alpha.value == 0):
+                        visible = False
+            if visible:
+                cloaked.value = 0
+                try:
+                    _dwmapi.DwmGetWindowAttribute(current, DWMWA_CLOAKED, byref(cloaked), ctypes.sizeof(cloaked))
+                except OSError:
+                    pass
+                # 被 DWM 隐藏的窗口（如后台的 UWP 应用）不会绘制到屏幕上
+                if not cloaked.value:
+                    try:
+                        _dwmapi.DwmGetWindowAttribute(current, DWMWA_EXTENDED_FRAME_BOUNDS,
+                                                      byref(other), ctypes.sizeof(RECT))
+                    except OSError:
+                        _user32.GetWindowRect(current, byref(other))
+                    if (other.left < bounds.right and bounds.left < other.right
+                            and other.top < bounds.bottom and bounds.top < other.bottom):
+                        return True
+            current = _user32.GetWindow(current, GW_HWNDPREV)
+        return False
+
     def capture_with_composition(self, hwnd: int) -> Optional[Image.Image]:
         """
-        尝试使用 DWM 合成捕获 DirectX 内容。
-        这是一种替代方法，可能适用于其他方法失败的某些窗口。
+        从 DWM 合成后的桌面画面中截取窗口区域，适用于 GDI 无法读取的 DirectX 内容。
+        仅在窗口位于前台时有效。
         参数：
             hwnd: 窗口句柄
         返回：
             窗口内容的 PIL 图像，如果捕获失败则返回 None
         """
-        try:
-            # 获取窗口矩形
-            rect = win32gui.GetWindowRect(hwnd)
-            width = rect[2] - rect[0]
-            height = rect[3] - rect[1]
-            # 尝试强制窗口可见并捕获
-            # 保存当前窗口状态
-            was_iconic = self.is_window_minimized(hwnd)
-            was_visible = win32gui.IsWindowVisible(hwnd)
-            # 强制窗口可见并置于前台
-            if was_iconic:
-                self.user32.ShowWindow(hwnd, win32con.SW_RESTORE)
-            # 将窗口置于前台（可能有助于某些 DirectX 应用程序）
-            self.user32.SetForegroundWindow(hwnd)
-            time.sleep(0.1)  # 给窗口一些时间渲染
-            # 首先使用标准方法捕获
-            img = self.capture_standard(hwnd)
-            # 如果失败，尝试 PrintWindow
-            if img is None or self._is_blank_image(img):
-                img = self.capture_with_print_window(hwnd)
-            # 恢复窗口状态
-            if was_iconic:
-                self.user32.ShowWindow(hwnd, win32con.SW_MINIMIZE)
-            return img
-        except Exception as e:
-            self.log(f"合成捕获失败: {e}")
-            return None
+        pixels = self.capture_composition_array(hwnd)
+        return self._to_image(pixels) if pixels is not None else None
+
+    @_per_monitor_dpi
+    def prepare(self, hwnd: int, width: Optional[int] = None, height: Optional[int] = None,
+                method: str = "standard") -> Callable[[], Optional[np.ndarray]]:
+        """
+        为尺寸固定的窗口预先创建专用的设备上下文、位图和像素缓冲区，返回无参数的捕获函数。
+        返回的 grab() 只执行一次绘制和一次 GetDIBits，不查询窗口尺寸，也不查找缓存，适合高帧率循环。
+        这些资源不与 screenshot_window 的缓存共享，在 close() 时释放；窗口尺寸变化后需要重新调用 prepare，
+        此时同一窗口之前的资源会被释放，之前返回的 grab() 不能再使用。
+        参数：
+            hwnd: 窗口句柄
+            width: 捕获宽度（为 None 时使用当前窗口宽度）
+            height: 捕获高度（为 None 时使用当前窗口高度）
+            method: 绘制方法 ("standard" 或 "printwindow")
+        返回：
+            捕获函数 grab()，返回形状为 (height, width, 4) 的 BGRA 数组（每次调用都写入同一缓冲区），
+            绘制或读取失败时返回 None
+        异常：
+            ValueError: 如果指定了不支持的绘制方法
+            OSError: 如果无法创建设备上下文或位图
+        """
+        if method not in ("standard", "printwindow"):
+            raise ValueError(f"prepare 不支持的捕获方法: {method}")
+        if width is None or height is None:
+            window_width, window_height = self._get_window_size(hwnd)
+            width = window_width if width is None else width
+            height = window_height if height is None else height
+        previous = self._prepared.pop(hwnd, None)
+        if previous is not None:
+            self._free_dc(hwnd, previous)
+        entry = self._create_dc(hwnd, width, height)
+        self._prepared[hwnd] = entry
+        hwnd_dc, mem_dc, bitmap, _, _, _, pixels, bmi = entry
+        # 所有参数在此处绑定为闭包变量，grab 内部不再有属性或字典查找
+        bit_blt = self._BitBlt
+        print_window = self._PrintWindow
+        get_dibits = self._GetDIBits
+        address = pixels.ctypes.data
+        bmi_ref = byref(bmi)
+        srccopy = win32con.SRCCOPY
 
+        if method == "standard":
+            def grab() -> Optional[np.ndarray]:
+                if not bit_blt(mem_dc, 0, 0, width, height, hwnd_dc, 0, 0, srccopy):
+                    return None
+                if get_dibits(mem_dc, bitmap, 0, height, address, bmi_ref, DIB_RGB_COLORS) != height:
+                    return None
+                return pixels
+        else:
+            def grab() -> Optional[np.ndarray]:
+                if not print_window(hwnd, mem_dc, PW_RENDERFULLCONTENT):
+                    return None
+                if get_dibits(mem_dc, bitmap, 0, height, address, bmi_ref, DIB_RGB_COLORS) != height:
+                    return None
+                return pixels
+        return grab
+
+    @_per_monitor_dpi
     def screenshot_window(self, hwnd: int, save_path: Optional[str] = None,
-                          method: str = "auto") -> Optional[Image.Image]:
+                          method: str = "auto",
+                          return_numpy: bool = False,
+                          fmt: Optional[str] = None) -> Optional[Union[Image.Image, np.ndarray]]:
         """
         使用指定方法捕获窗口的屏幕截图。
         参数：
             hwnd: 窗口句柄
             save_path: 保存屏幕截图的路径（如果为 None，则不保存直接返回图像）
-            method: 捕获方法 ("standard", "printwindow", "d3d", "composition", 或 "auto")
+            method: 捕获方法 ("wgc", "standard", "printwindow", "d3d", "composition", 或 "auto")
+            return_numpy: 如果为 True，直接返回 BGRA numpy 数组（下次捕获同一窗口时会被覆盖），跳过 PIL 转换
+            fmt: 数组输出格式 ("gray", "gray_half", "rgb", 或 "bgra")，指定后返回该格式的数组并跳过 PIL 转换；
+                 "gray" 为灰度，"gray_half" 为宽高各减半的灰度，"bgra" 等同于 return_numpy=True
         返回：
-            PIL 图像对象，如果捕获失败则返回 None
+            PIL 图像对象（或 return_numpy/fmt 指定时的 numpy 数组），如果捕获失败则返回 None
         异常：
-            ValueError: 如果指定了未知的捕获方法
+            ValueError: 如果指定了未知的捕获方法或输出格式
         """
+        capture_methods = {
+            "wgc": self.capture_wgc_array,
+            "standard": self.capture_standard_array,
+            "printwindow": self.capture_print_window_array,
+            "d3d": self.capture_d3d_array,
+            "composition": self.capture_composition_array
+        }
+        # GDI 方法可以共享同一组设备上下文和位图
+        capture_into = {
+            "standard": self._capture_standard_into,
+            "printwindow": self._capture_printwindow_into,
+            "d3d": self._capture_wmprint_into
+        }
+        if method != "auto" and method not in capture_methods:
+            raise ValueError(f"未知的捕获方法: {method}")
+        if fmt is not None and fmt not in OUTPUT_FORMATS:
+            raise ValueError(f"未知的输出格式: {fmt}")
         # 检查窗口是否最小化
         was_minimized = self.is_window_minimized(hwnd)
         if was_minimized:
             self.restore_window(hwnd)
         # 尝试使用指定方法捕获
-        img = None
+        pixels = None
         if method == "auto":
             # 按复杂性/兼容性顺序尝试方法
-            methods = ["standard", "printwindow", "d3d", "composition"]
-            for m in methods:
+            entry = None
+            used = None
+            for m in AUTO_METHODS:
                 self.log(f"尝试 {m} 方法...")
-                if m == "standard":
-                    img = self.capture_standard(hwnd)
-                elif m == "printwindow":
-                    img = self.capture_with_print_window(hwnd)
-                elif m == "d3d":
-                    img = self.capture_with_d3d(hwnd)
-                elif m == "composition":
-                    img = self.capture_with_composition(hwnd)
+                if m in capture_into:
+                    # 只在第一个 GDI 方法时获取设备上下文，之后的回退直接绘制到同一位图中
+                    try:
+                        if entry is None:
+                            width, height = self._get_window_size(hwnd)
+                            entry = self._get_or_create_dc(hwnd, width, height)
+                        pixels = self._read_pixels(entry) if capture_into[m](entry, hwnd) else None
+                    except Exception as e:
+                        self.log(f"{m} 方法出错: {e}")
+                        self._release_dc(hwnd)
+                        entry = None
+                        pixels = None
+                else:
+                    pixels = capture_methods[m](hwnd)
                 # 如果获得非空白图像，则退出循环
-                if img is not None and not self._is_blank_image(img):
+                if pixels is not None and not self._is_blank_image(pixels):
                     self.log(f"{m} 方法成功！")
+                    used = m
                     break
                 else:
                     self.log(f"{m} 方法失败或返回空白图像。")
-        elif method == "standard":
-            img = self.capture_standard(hwnd)
-        elif method == "printwindow":
-            img = self.capture_with_print_window(hwnd)
-        elif method == "d3d":
-            img = self.capture_with_d3d(hwnd)
-        elif method == "composition":
-            img = self.capture_with_composition(hwnd)
+            if used != "wgc":
+                # 未采用 WGC 时停止其会话，避免持续占用 GPU（Windows 10 上还会一直显示黄色捕获边框）
+                self._release_wgc(hwnd)
         else:
-            raise ValueError(f"未知的捕获方法: {method}")
+            pixels = capture_methods[method](hwnd)
         # 如果之前是最小化状态，恢复到该状态
         if was_minimized:
-            self.user32.ShowWindow(hwnd, win32con.SW_MINIMIZE)
+            self._ShowWindow(hwnd, win32con.SW_MINIMIZE)
+        if pixels is None:
+            return None
+        as_array = return_numpy or fmt is not None
+        img = self._to_image(pixels) if not as_array or save_path else None
         # 如果提供了路径，则保存图像
-        if img is not None and save_path:
+        if save_path:
             img.save(save_path)
             self.log(f"图像已保存到 {save_path}")
-        return img
+        if fmt is not None:
+            return self._convert_pixels(pixels, fmt)
+        return pixels if return_numpy else img
 
-    def _is_blank_image(self, img: Image.Image, threshold: float = 0.95) -> bool:
+    def _is_blank_image(self, img: Union[Image.Image, np.ndarray], threshold: float = 0.95) -> bool:
         """
         检查图像是否大部分为空白（单一颜色）。
         参数：
-            img: 要检查的 PIL 图像
+            img: 要检查的 PIL 图像（RGB）或 numpy 数组（BGRA）
             threshold: 判断图像是否为空白的阈值
         返回：
             如果检测到图像为空白则返回 True，否则返回 False
         """
-        # 转换为 numpy 数组并检查方差
-        img_array = np.array(img)
+        img_array = np.asarray(img)
         # 检查大多数像素是否为相同颜色
         if img_array.size == 0:
             return True
-        # 计算每个通道的方差
-        r_var = np.var(img_array[:, :, 0])
-        g_var = np.var(img_array[:, :, 1])
-        b_var = np.var(img_array[:, :, 2])
+        # 先在 4x4 固定网格（含四角、边缘和中心区域）上取 16 个采样点，
+        # 颜色差异明显时直接判定为非空白，无需遍历整幅图像
+        height, width = img_array.shape[:2]
+        ys = [0, height // 3, height * 2 // 3, height - 1]
+        xs = [0, width // 3, width * 2 // 3, width - 1]
+        samples = img_array[np.ix_(ys, xs)][..., :3].reshape(-1, 3).astype(np.int32)
+        if (samples.max(axis=0) - samples.min(axis=0)).sum() > 30:
+            return False
+        # 以 8 倍步长降采样，只检查 1/64 的像素
+        sampled = img_array[::8, ::8, :3]
+        # 各通道极差直接在 uint8 上计算，无需扩展为浮点数；
+        # 极差很小必为空白，极差较大则不是空白，只有介于两者之间时才计算方差
+        spread = int(np.ptp(sampled, axis=(0, 1)).sum())
+        if spread < 8:
+            return True
+        if spread > 32:
+            return False
+        # 使用整数 BT.601 权重转换为亮度，只计算一次方差
+        # PIL 图像为 RGB 通道顺序，捕获得到的 numpy 数组为 BGRA 通道顺序
+        weights = (77, 150, 29) if isinstance(img, Image.Image) else (29, 150, 77)
+        if NUMBA_AVAILABLE:
+            return _luma_variance(img_array, 8, *weights) < 100
+        channels = sampled.astype(np.int32)
+        luma = (channels[..., 0] * weights[0] + channels[..., 1] * weights[1] + channels[..., 2] * weights[2]) >> 8
         # 如果方差非常低，则图像可能是空白的
-        return (r_var + g_var + b_var) / 3 < 100
+        return luma.var() < 100
 
     def get_all_windows(self) -> List[Dict[str, Any]]:
         """
@@ -452,6 +1581,207 @@ class WindowScreenshot:
         return formatted_output
 
 
+class StreamingCapture:
+    """
+    在后台线程中持续捕获窗口，并通过三重缓冲发布最新一帧。
+    捕获线程只写入"写"缓冲区，读取方只读取"读"缓冲区，两者通过交换索引传递帧，互不阻塞。
+    目标窗口不能处于最小化状态。
+    """
+    # 自动模式下选中的方法连续失败（返回 None 或空白图像）达到该次数后重新选择方法
+    RESELECT_AFTER_FAILURES = 30
+
+    def __init__(self, hwnd: int, method: str = "auto", interval: float = 0.0, verbose: bool = False):
+        """
+        初始化 StreamingCapture。
+        参数：
+            hwnd: 窗口句柄
+            method: 捕获方法 ("wgc", "standard", "printwindow", "d3d", "composition", 或 "auto")，
+                    "auto" 会在第一帧时选出可用的方法并在之后一直使用，该方法持续失败时重新选择
+            interval: 两次捕获之间的最小间隔（秒），0 表示尽可能快
+            verbose: 如果为 True，打印详细日志
+        """
+        self.hwnd = hwnd
+        self.method = method
+        self.interval = interval
+        self.verbose = verbose
+        # 捕获线程使用的截图对象，其缓冲池同时用于帧缓冲区和 latest(copy=True) 返回的副本
+        self._screenshot = WindowScreenshot(verbose=verbose)
+        # latest(copy=True) 借出且尚未归还的副本；未归还就被回收的副本会自动移除
+        self._lent: "weakref.WeakValueDictionary[int, np.ndarray]" = weakref.WeakValueDictionary()
+        # 三个帧缓冲区及其角色索引：写、就绪、读
+        self._buffers: List[Optional[np.ndarray]] = [None, None, None]
+        self._write_index = 0
+        self._ready_index = 1
+        self._read_index = 2
+        self._has_new_frame = False
+        self._frame_id = 0
+        self._lock = threading.Lock()
+        self._frame_event = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def __enter__(self) -> "StreamingCapture":
+        self.start()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.stop()
+
+    @property
+    def frame_id(self) -> int:
+        """已发布的帧数。"""
+        return self._frame_id
+
+    def start(self) -> None:
+        """启动后台捕获线程。"""
+        if self._thread is not None:
+            if self._thread.is_alive() and not self._stop_event.is_set():
+                return
+            # 等待上次 stop 超时后仍在运行的线程退出，避免两个线程共用缓冲区和截图对象
+            self._thread.join()
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name=f"StreamingCapture-{self.hwnd}", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = 2.0) -> None:
+        """
+        停止后台捕获线程。
+        参数：
+            timeout: 等待线程退出的最长时间（秒）
+        """
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            if not self._thread.is_alive():
+                self._thread = None
+
+    def wait_frame(self, timeout: Optional[float] = None) -> bool:
+        """
+        等待新帧到达。
+        参数：
+            timeout: 最长等待时间（秒），None 表示一直等待
+        返回：
+            如果有尚未读取的新帧则返回 True，超时则返回 False
+        """
+        return self._frame_event.wait(timeout)
+
+    def latest(self, copy: bool = False) -> Optional[np.ndarray]:
+        """
+        获取最新一帧，从不阻塞捕获线程。
+        参数：
+            copy: 如果为 True，返回从缓冲池取出的可写副本，用完后应调用 release 归还
+        返回：
+            形状为 (height, width, 4) 的 BGRA 数组，如果还没有捕获到任何帧则返回 None。
+            copy 为 False 时返回只读视图，在下次调用 latest 之前有效
+        """
+        with self._lock:
+            if self._has_new_frame:
+                self._read_index, self._ready_index = self._ready_index, self._read_index
+                self._has_new_frame = False
+                self._frame_event.clear()
+            frame = self._buffers[self._read_index]
+        if frame is None:
+            return None
+        if copy:
+            out = self._screenshot._borrow(frame.shape)
+            np.copyto(out, frame)
+            self._lent[id(out)] = out
+            return out
+        view = frame.view()
+        view.flags.writeable = False
+        return view
+
+    def release(self, frame: np.ndarray) -> None:
+        """
+        归还 latest(copy=True) 返回的帧副本，供之后的帧复用。归还后不应再访问该数组。
+        参数：
+            frame: 不再使用的帧副本；不是由 latest(copy=True) 返回的数组会被忽略
+        """
+        if self._lent.pop(id(frame), None) is frame:
+            self._screenshot._release(frame)
+
+    def _publish(self, pixels: np.ndarray) -> None:
+        """将捕获结果复制到写缓冲区，然后与就绪缓冲区交换。"""
+        buffer = self._buffers[self._write_index]
+        if buffer is None or buffer.shape != pixels.shape:
+            # 窗口尺寸变化，旧缓冲区归还缓冲池
+            self._screenshot._release(buffer)
+            buffer = self._screenshot._borrow(pixels.shape)
+            self._buffers[self._write_index] = buffer
+        np.copyto(buffer, pixels)
+        with self._lock:
+            self._write_index, self._ready_index = self._ready_index, self._write_index
+            self._has_new_frame = True
+            self._frame_id += 1
+            self._frame_event.set()
+
+    def _run(self) -> None:
+        """后台捕获线程的主循环。"""
+        # 捕获线程是专用线程，直接永久设置 DPI 感知
+        set_thread_dpi_awareness()
+        _thread_state.dpi_aware = True
+        screenshot = self._screenshot
+        capture_methods = {
+            "wgc": lambda hwnd: screenshot.capture_wgc_array(hwnd, zero_copy=True),
+            "standard": screenshot.capture_standard_array,
+            "printwindow": screenshot.capture_print_window_array,
+            "d3d": screenshot.capture_d3d_array,
+            "composition": screenshot.capture_composition_array
+        }
+        if self.method == "auto":
+            # 与 screenshot_window 的自动模式一致，窗口未处理 WM_PRINT 时跳过像素读取
+            capture_methods["d3d"] = lambda hwnd: screenshot.capture_d3d_array(hwnd, require_handled=True)
+        auto = self.method == "auto"
+        method = self.method
+        last_wgc_frame = -1
+        failures = 0
+        try:
+            while not self._stop_event.is_set():
+                started = time.perf_counter()
+                if method == "auto":
+                    # 选出第一个返回非空白图像的方法，之后一直使用
+                    for m in AUTO_METHODS:
+                        pixels = capture_methods[m](self.hwnd)
+                        if pixels is not None and not screenshot._is_blank_image(pixels):
+                            screenshot.log(f"流式捕获使用 {m} 方法")
+                            method = m
+                            if m != "wgc":
+                                screenshot._release_wgc(self.hwnd)
+                            break
+                    else:
+                        self._stop_event.wait(0.1)
+                        continue
+                else:
+                    pixels = capture_methods[method](self.hwnd)
+                    if auto and pixels is not None and screenshot._is_blank_image(pixels):
+                        pixels = None
+                if pixels is None:
+                    failures += 1
+                    if auto and failures >= self.RESELECT_AFTER_FAILURES:
+                        # 例如 WGC 会话出错或窗口失去前台导致合成捕获失效
+                        screenshot.log(f"{method} 方法连续失败，重新选择捕获方法")
+                        method = "auto"
+                        failures = 0
+                    self._stop_event.wait(0.01)
+                    continue
+                failures = 0
+                if method == "wgc":
+                    # 窗口内容未变化时 WGC 不产生新帧，不重复发布
+                    frame_number = screenshot._wgc_cache[self.hwnd].frame_number
+                    if frame_number == last_wgc_frame:
+                        self._stop_event.wait(0.001)
+                        continue
+                    last_wgc_frame = frame_number
+                self._publish(pixels)
+                remaining = self.interval - (time.perf_counter() - started)
+                if remaining > 0:
+                    self._stop_event.wait(remaining)
+        except Exception as e:
+            screenshot.log(f"流式捕获线程异常退出: {e}")
+        finally:
+            screenshot.close()
+
+
 # 辅助函数
 def list_all_windows(verbose: bool = True) -> List[Dict[str, Any]]:
     """
@@ -496,19 +1826,23 @@ def find_windows(title_substring: str, verbose: bool = True) -> List[Dict[str, A
     return windows
 
 def capture_window(hwnd: int, save_path: Optional[str] = None,
-                   method: str = "auto", verbose: bool = False) -> Optional[Image.Image]:
+                   method: str = "auto", verbose: bool = False,
+                   return_numpy: bool = False,
+                   fmt: Optional[str] = None) -> Optional[Union[Image.Image, np.ndarray]]:
     """
     捕获窗口的屏幕截图。
     参数：
         hwnd: 窗口句柄
         save_path: 保存屏幕截图的路径（如果为 None，则不保存直接返回图像）
-        method: 捕获方法 ("standard", "printwindow", "d3d", "composition", 或 "auto")
+        method: 捕获方法 ("wgc", "standard", "printwindow", "d3d", "composition", 或 "auto")
         verbose: 如果为 True，则在捕获期间打印详细日志
+        return_numpy: 如果为 True，返回 BGRA numpy 数组而不是 PIL 图像
+        fmt: 数组输出格式 ("gray", "gray_half", "rgb", 或 "bgra")
     返回：
-        PIL 图像对象，如果捕获失败则返回 None
+        PIL 图像对象（或 numpy 数组），如果捕获失败则返回 None
     """
     screenshot = WindowScreenshot(verbose=verbose)
-    return screenshot.screenshot_window(hwnd, save_path, method)
+    return screenshot.screenshot_window(hwnd, save_path, method, return_numpy, fmt)
 
 def capture_window_by_title(title_substring: str, save_path: Optional[str] = None,
                             method: str = "auto", verbose: bool = False) -> Optional[Image.Image]:
@@ -517,7 +1851,7 @@ def capture_window_by_title(title_substring: str, save_path: Optional[str] = Non
     参数：
         title_substring: 要在窗口标题中搜索的子字符串
         save_path: 保存屏幕截图的路径（如果为 None，则不保存直接返回图像）
-        method: 捕获方法 ("standard", "printwindow", "d3d", "composition", 或 "auto")
+        method: 捕获方法 ("wgc", "standard", "printwindow", "d3d", "composition", 或 "auto")
         verbose: 如果为 True，则在捕获期间打印详细日志
     返回：
         PIL 图像对象，如果未找到窗口或捕获失败则返回 None
@@ -539,7 +1873,7 @@ def main():
         print("  python window_screenshot.py list")
         print("  python window_screenshot.py capture <window_handle> [output_filename.png] [method]")
         print("  python window_screenshot.py search \"window title substring\" [output_filename.png] [method]")
-        print("\n方法: standard, printwindow, d3d, composition, auto (默认)")
+        print("\n方法: wgc, standard, printwindow, d3d, composition, auto (默认)")
         return
     command = sys.argv[1].lower()
     screenshot = WindowScreenshot(verbose=True)